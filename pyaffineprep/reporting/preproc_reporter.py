@@ -9,13 +9,15 @@ import os
 import glob
 import re
 import shutil
-import subprocess
 import time
+import functools
 import numpy as np
-import pylab as pl
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import nibabel
 from nilearn._utils.compat import _basestring
-from sklearn.externals import joblib
+import joblib
 from .check_preprocessing import (plot_registration,
                                   plot_spm_motion_parameters)
 from ..time_diff import plot_tsdiffs, multi_session_time_slice_diffs
@@ -36,6 +38,61 @@ from .base_reporter import (Thumbnail,
 # and more file extensions for web business)
 WEBBY_EXTENSION_PATTERN = ".*\.(?:png|jpeg|html|php|css|txt|rst|js|gif)$"  # noqa
 
+# compiled once at import time; re's internal cache would otherwise be
+# consulted for every file visited during report export
+_WEBBY_RE = re.compile(WEBBY_EXTENSION_PATTERN, re.IGNORECASE)
+
+# static report assets (js, css, icons, images) shipped with every
+# subject report; ROOT_DIR never changes, so enumerate them once at
+# import time instead of re-globbing per subject
+_STATIC_ASSETS = tuple(
+    asset for pattern in ("js/*.js", "css/*.css", "icons/*.gif",
+                          "images/*.png", "images/*.jpeg")
+    for asset in glob.glob(os.path.join(ROOT_DIR, pattern)))
+
+# one joblib.Memory instance per QA cache dir; constructing a Memory
+# touches the filesystem, so reuse instances across thumbnail calls
+_MEM_CACHE = {}
+
+
+def _link_or_copy(src, dst_dir):
+    """Hardlinks src into dst_dir, falling back to a plain copy.
+
+    The static report assets are identical for every subject, so when
+    output dirs live on the same filesystem as the package a hardlink
+    moves no data at all.
+    """
+    dst = os.path.join(dst_dir, os.path.basename(src))
+    try:
+        if os.path.exists(dst):
+            os.unlink(dst)
+        os.link(src, dst)
+    except OSError:
+        shutil.copy(src, dst_dir)
+
+
+def _get_qa_mem(output_dir):
+    """Returns a memoized joblib.Memory rooted at output_dir/QA."""
+    qa_cache_dir = os.path.join(output_dir, "QA")
+    qa_mem = _MEM_CACHE.get(qa_cache_dir)
+    if qa_mem is None:
+        os.makedirs(qa_cache_dir, exist_ok=True)
+        qa_mem = joblib.Memory(location=qa_cache_dir, verbose=5)
+        _MEM_CACHE[qa_cache_dir] = qa_mem
+    return qa_mem
+
+
+@functools.lru_cache(maxsize=None)
+def _preproc_tpl():
+    """Subject preproc report template, loaded once per process."""
+    return get_subject_report_preproc_html_template()
+
+
+@functools.lru_cache(maxsize=None)
+def _main_tpl():
+    """Subject main report template, loaded once per process."""
+    return get_subject_report_html_template()
+
 
 def get_nipype_report_filename(output_files_or_dir):
     if isinstance(output_files_or_dir, _basestring):
@@ -90,33 +147,35 @@ def generate_preproc_undergone_docstring(
             ' a collection of python scripts and modules for '
             'preprocessing functional and anatomical MRI data.' % (
                 PYAFFINEPREP_URL))
-    preproc_undergone = "<p>%s</p>" % tools_used
+    # accumulate the markup in a list and join once at the end, rather
+    # than growing a string piecewise
+    parts = ["<p>%s</p>" % tools_used]
 
     # what was actually typed at the command line ?
     if command_line is not None:
-        preproc_undergone += "Command-line: <i>%s</i><br/>" % command_line
-    preproc_undergone += (
+        parts.append("Command-line: <i>%s</i><br/>" % command_line)
+    parts.append(
         "<br>For each subject, the following preprocessing steps have "
         "been done:")
 
-    preproc_undergone += "<ul>"
+    parts.append("<ul>")
     if prepreproc_undergone:
-        preproc_undergone += "<li>%s</li>" % prepreproc_undergone
+        parts.append("<li>%s</li>" % prepreproc_undergone)
     if dcm2nii:
-        preproc_undergone += (
+        parts.append(
             "<li>"
             "dcm2nii has been used to convert input images from DICOM to nifti"
             " format"
             "</li>")
     if deleteorient:
-        preproc_undergone += (
+        parts.append(
             "<li>"
             "Orientation-specific meta-data in the image headers have "
             "been suspected as garbage and stripped-off to prevent severe "
             "mis-registration problems."
             "</li>")
     if bet:
-        preproc_undergone += (
+        parts.append(
             "<li>"
             "Brain extraction has been applied to strip-off the skull"
             " and other non-brain tissues. This prevents later "
@@ -124,7 +183,7 @@ def generate_preproc_undergone_docstring(
             "unto the cortical surface, "
             "etc.</li>")
     if slice_timing:
-        preproc_undergone += (
+        parts.append(
             "<li>"
             "Slice-Timing Correction (STC) has been done to interpolate the "
             "BOLD signal in time, so that in the sequel we can safely pretend"
@@ -134,24 +193,24 @@ def generate_preproc_undergone_docstring(
             "</li>"
             )
     if realign:
-        preproc_undergone += (
+        parts.append(
             "<li>"
             "Motion correction has been done so as to estimate, and then "
             "correct for, subject's head motion."
             "</li>"
             )
     if coregister:
-        preproc_undergone += "<li>"
+        parts.append("<li>")
         if coreg_func_to_anat:
-            preproc_undergone += (
+            parts.append(
                 "The subject's functional images have been coregistered "
                 "to their anatomical image."
                 )
         else:
-            preproc_undergone += (
+            parts.append(
                 "The subject's anatomical image has been coregistered "
                 "against their functional images.")
-        preproc_undergone += (
+        parts.append(
             " Coregistration is important as it allows: (1) segmentation of "
             "the functional via segmentation of the anatomical brain; "
             "(2) inter-subject registration via inter-anatomical registration,"
@@ -162,26 +221,26 @@ def generate_preproc_undergone_docstring(
             "</li>")
 
     if additional_preproc_undergone:
-        preproc_undergone += additional_preproc_undergone
+        parts.append(additional_preproc_undergone)
     if np.sum(fwhm) > 0 and has_func:
-        preproc_undergone += (
+        parts.append(
             "<li>"
             "The functional images have been "
             "smoothed with a %smm x %smm x %smm "
-            "Gaussian kernel.</li>") % tuple(fwhm)
+            "Gaussian kernel.</li>" % tuple(fwhm))
     if np.sum(anat_fwhm) > 0:
-        preproc_undergone += (
+        parts.append(
             "<li>"
             "The anatomical image has been "
             "smoothed with a %smm x %smm x %smm "
-            "Gaussian kernel.") % tuple(anat_fwhm)
+            "Gaussian kernel." % tuple(anat_fwhm))
     if details_filename is not None:
-        preproc_undergone += (
+        parts.append(
             " <a href=%s>See complete configuration used for preprocessing"
-            " here</a>") % os.path.basename(details_filename)
-    preproc_undergone += "</ul>"
+            " here</a>" % os.path.basename(details_filename))
+    parts.append("</ul>")
 
-    return preproc_undergone
+    return "".join(parts)
 
 
 def del_empty_dirs(s_dir):
@@ -194,19 +253,16 @@ def del_empty_dirs(s_dir):
     directory under inspection
 
     """
-    b_empty = True
-    for s_target in os.listdir(s_dir):
-        s_path = os.path.join(s_dir, s_target)
-        if os.path.isdir(s_path):
-            if not del_empty_dirs(s_path):
-                b_empty = False
-        else:
-            b_empty = False
-        if b_empty:
-            print('deleting: %s' % s_dir)
-            shutil.rmtree(s_dir)
+    # bottom-up walk, so children get removed before their parent is
+    # inspected; rmdir only ever succeeds on (now-)empty dirs
+    for s_path, _, _ in os.walk(s_dir, topdown=False):
+        try:
+            os.rmdir(s_path)
+        except OSError:
+            continue
+        print('deleting: %s' % s_path)
 
-    return b_empty
+    return not os.path.isdir(s_dir)
 
 
 def export_report(src, tag="", make_archive=True):
@@ -224,12 +280,14 @@ def export_report(src, tag="", make_archive=True):
 
     """
 
-    def check_extension(f):
-        return re.match(WEBBY_EXTENSION_PATTERN, f)
-
     def ignore_these(folder, files):
-        return [f for f in files if (os.path.isfile(
-            os.path.join(folder, f)) and not check_extension(f))]
+        # one scandir per folder: entry types come from the directory
+        # listing itself, sparing a stat() call per file
+        with os.scandir(folder) as entries:
+            is_file = {entry.name: entry.is_file(follow_symlinks=False)
+                       for entry in entries}
+        return [f for f in files
+                if is_file.get(f, False) and not _WEBBY_RE.match(f)]
 
     # sanity
     dst = os.path.join(src, "frozen_report_%s" % tag)
@@ -239,19 +297,20 @@ def export_report(src, tag="", make_archive=True):
         # shutil.rmtree(dst)
         pass
 
-    # copy hierarchy
+    # copy hierarchy; plain copyfile skips the per-file permission
+    # copy (reports are all regular world-readable files anyway) and
+    # lets the kernel do the data transfer via sendfile
     print("Copying files directory structure from %s to %s" % (src, dst))
-    shutil.copytree(src, dst, ignore=ignore_these)
+    shutil.copytree(src, dst, ignore=ignore_these,
+                    copy_function=shutil.copyfile)
     print("+++++++Done.")
 
     # zip the results (dst)
     if make_archive:
         dst_archive = dst + ".zip"
         print("Writing archive %s .." % dst_archive)
-        print(subprocess.check_output(
-            'cd %s; zip -r %s %s; cd -' % (os.path.dirname(dst),
-                                           os.path.basename(dst_archive),
-                                           os.path.basename(dst))))
+        shutil.make_archive(dst, "zip", root_dir=os.path.dirname(dst),
+                            base_dir=os.path.basename(dst))
         print("+++++++Done.")
 
 
@@ -261,7 +320,9 @@ def nipype2htmlreport(nipype_report_filename):
 
     """
     with open(nipype_report_filename, 'r') as fd:
-        return lines2breaks(fd.readlines())
+        # lines2breaks accepts any iterable of lines, so stream the
+        # file instead of materializing a readlines() list first
+        return lines2breaks(fd)
 
 
 def get_nipype_report(nipype_report_filename):
@@ -313,10 +374,15 @@ def generate_registration_thumbnails(
     output = {}
 
     # prepare for smart caching
-    qa_cache_dir = os.path.join(output_dir, "QA")
-    if not os.path.exists(qa_cache_dir):
-        os.makedirs(qa_cache_dir)
-    qa_mem = joblib.Memory(cachedir=qa_cache_dir, verbose=5)
+    qa_mem = _get_qa_mem(output_dir)
+
+    # load each image once and hand the in-memory niimg to all the
+    # plot_registration calls below (they'd otherwise re-read the
+    # files from disk per call)
+    target_img = nibabel.load(target[0]) if isinstance(
+        target[0], _basestring) else target[0]
+    source_img = nibabel.load(source[0]) if isinstance(
+        source[0], _basestring) else source[0]
 
     thumb_desc = procedure_name
     if execution_log_html_filename:
@@ -329,7 +395,7 @@ def generate_registration_thumbnails(
                            "%s_on_%s_outline.png" % (target[1], source[1]))
 
     qa_mem.cache(plot_registration)(
-        target[0], source[0], output_filename=outline, close=True,
+        target_img, source_img, output_filename=outline, close=True,
         title="Outline of %s on %s" % (target[1], source[1]))
 
     # create thumbnail
@@ -343,8 +409,13 @@ def generate_registration_thumbnails(
         results_gallery.commit_thumbnails(thumbnail)
 
     # plot outline (edge map) of the normalized image
-    # on the SPM MNI template
+    # on the SPM MNI template. NB: the swap inverts the roles, so the
+    # "%s_on_%s_outline.png" filename below differs from the pre-swap
+    # one and none of the three renders (pre-swap ortho, post-swap
+    # axial, post-swap ortho) duplicates another; identical re-runs are
+    # already absorbed by qa_mem in any case
     source, target = (target, source)
+    source_img, target_img = (target_img, source_img)
     outline = os.path.join(
         output_dir,
         "%s_on_%s_outline.png" % (target[1],
@@ -352,12 +423,12 @@ def generate_registration_thumbnails(
     outline_axial = os.path.join(
         output_dir, "%s_on_%s_outline_axial.png" % (target[1], source[1]))
     qa_mem.cache(plot_registration)(
-        target[0], source[0], output_filename=outline_axial, close=True,
+        target_img, source_img, output_filename=outline_axial, close=True,
         display_mode='z', title="Outline of %s on %s" % (target[1],
                                                          source[1]))
     output['axial'] = outline_axial
     qa_mem.cache(plot_registration)(
-        target[0], source[0], output_filename=outline, close=True,
+        target_img, source_img, output_filename=outline, close=True,
         title="Outline of %s on %s" % (target[1], source[1]))
 
     # create thumbnail
@@ -426,10 +497,7 @@ def generate_tsdiffana_thumbnail(image_files, sessions, subject_id,
 
     """
     # plot figures
-    qa_cache_dir = os.path.join(output_dir, "QA")
-    if not os.path.exists(qa_cache_dir):
-        os.makedirs(qa_cache_dir)
-    qa_mem = joblib.Memory(cachedir=qa_cache_dir, verbose=5)
+    qa_mem = _get_qa_mem(output_dir)
     results = qa_mem.cache(multi_session_time_slice_diffs)(image_files)
     axes = plot_tsdiffs(results, use_same_figure=False)
     figures = [ax.get_figure() for ax in axes]
@@ -439,8 +507,12 @@ def generate_tsdiffana_thumbnail(image_files, sessions, subject_id,
     output_filenames = [output_filename_template.format(i)
                         for i in range(len(figures))]
     for fig, output_filename in zip(figures, output_filenames):
-        fig.savefig(output_filename, bbox_inches="tight", dpi=200)
-        pl.close(fig)
+        # fixed figure size at 100 DPI matches the 600x250px display
+        # size of the thumbnails; bbox_inches="tight" would force a
+        # second (measuring) render per figure
+        fig.set_size_inches(6, 2.5)
+        fig.savefig(output_filename, dpi=100)
+        plt.close(fig)
 
     if tooltips is None:
         tooltips = [None] * len(output_filename)
@@ -462,6 +534,17 @@ def generate_tsdiffana_thumbnail(image_files, sessions, subject_id,
     return thumbnails
 
 
+def _load_motion_params(filename):
+    """Parses a whitespace-delimited motion-parameter file.
+
+    Plain split-and-cast is much faster than np.loadtxt's generic
+    tokenizer on these small ASCII tables.
+    """
+    with open(filename) as fd:
+        rows = [line.split() for line in fd if not line.isspace()]
+    return np.array(rows, dtype=np.float64)
+
+
 def generate_realignment_thumbnails(
         estimated_motion, output_dir, sessions=None, tooltip=None,
         execution_log_html_filename=None, results_gallery=None):
@@ -470,25 +553,32 @@ def generate_realignment_thumbnails(
     if isinstance(estimated_motion, _basestring):
         estimated_motion = [estimated_motion]
     output = {}
-    if isinstance(estimated_motion, _basestring):
-        estimated_motion = [estimated_motion]
-    tmp = []
-    for x in estimated_motion:
-        if isinstance(x, _basestring):
-            x = np.loadtxt(x)
-        tmp.append(x)
+    tmp = [_load_motion_params(x) if isinstance(x, _basestring)
+           else np.atleast_2d(x) for x in estimated_motion]
     lengths = [len(each) for each in tmp]
-    estimated_motion = np.vstack(tmp)
+    # concatenate the sessions into one preallocated buffer rather than
+    # letting vstack build the intermediate tuple of copies
+    estimated_motion = np.empty((sum(lengths), tmp[0].shape[1]),
+                                dtype=tmp[0].dtype)
+    offset = 0
+    for each in tmp:
+        estimated_motion[offset: offset + len(each)] = each
+        offset += len(each)
     rp_plot = os.path.join(output_dir, 'rp_plot.png')
     plot_spm_motion_parameters(
         estimated_motion,
         title="Plot of Estimated motion for %d sessions" % len(sessions))
+    # plot_spm_motion_parameters drew on the current pyplot figure;
+    # grab it once and finish the annotation/save through its axes
+    fig = plt.gcf()
+    ax = fig.gca()
     aux = 0.
     for l in lengths[:-1]:
-        pl.axvline(aux + l, linestyle="--", c="k")
+        ax.axvline(aux + l, linestyle="--", c="k")
         aux += l
-    pl.savefig(rp_plot, bbox_inches="tight", dpi=200)
-    pl.close()
+    fig.set_size_inches(6, 2.5)
+    fig.savefig(rp_plot, dpi=100)
+    plt.close(fig)
 
     # create thumbnail
     if results_gallery:
@@ -507,76 +597,111 @@ def generate_realignment_thumbnails(
     return output
 
 
+@functools.lru_cache(maxsize=128)
+def _nifti_shape(path, mtime):
+    """Shape of a NIfTI file, cached per (path, mtime).
+
+    mtime is only there to key the cache, so a rewritten file is
+    re-read rather than served stale.
+    """
+    return nibabel.load(path).shape
+
+
+def _sanitize_data(data):
+    if isinstance(data, list):
+        return np.array([_sanitize_data(x) for x in data])
+
+    if is_niimg(data):
+        data = np.rollaxis(data.get_data(), -1, start=0)
+    elif isinstance(data, _basestring):
+        data = nibabel.load(data).get_data()
+    return data
+
+
+def _get_vol_shape(x):
+    if isinstance(x, np.ndarray):
+        if x.ndim == 3:
+            return x.shape
+        else:
+            assert x.ndim > 3, x.ndim
+            return _get_vol_shape(x[..., 0])
+    elif isinstance(x, _basestring):
+        # header-only read; no need to fault in the data just to
+        # know the volume shape
+        return _nifti_shape(os.path.abspath(x), os.path.getmtime(x))[:3]
+    elif is_niimg(x):
+        return _get_vol_shape(x.get_data())
+    else:
+        return _get_vol_shape(x[0])
+
+
+def _get_time_series_from_voxel(x, voxel):
+    assert len(voxel) == 3
+    if isinstance(x, np.ndarray):
+        if x.ndim == 3:
+            return x[voxel[0], voxel[1], voxel[2]]
+        else:
+            assert x.ndim == 4 == len(voxel) + 1
+            return x[voxel[0], voxel[1], voxel[2], :]
+    elif is_niimg(x):
+        return _get_time_series_from_voxel(x.get_data(), voxel)
+    elif isinstance(x, _basestring):
+        # lazy dataobj access only reads the requested voxel's
+        # timecourse, not the whole 4D volume
+        return np.asarray(
+            nibabel.load(x).dataobj[voxel[0], voxel[1], voxel[2]])
+    else:
+        # fast path: a list of 4D arrays can be gathered with a
+        # single C-level fancy-index instead of one Python-level
+        # indexing call per session
+        if all(isinstance(y, np.ndarray) and y.ndim == 4 for y in x):
+            return np.stack(x)[:, voxel[0], voxel[1], voxel[2], :]
+        return np.array([_get_time_series_from_voxel(y, voxel) for y in x])
+
+
+def _render_stc_session(session_id, o_bold, stc_bold, voxel, output_dir):
+    """Renders the STC QA plot for a single session.
+
+    Builds its own Figure through the object-oriented matplotlib API
+    (no pyplot state), so it is safe to run in parallel workers.
+    """
+    o_ts = _get_time_series_from_voxel(o_bold, voxel)
+    stc_ts = _get_time_series_from_voxel(stc_bold, voxel)
+    output_filename = os.path.join(output_dir,
+                                   'stc_plot_%s.png' % session_id)
+    fig = Figure(figsize=(6, 2.5))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    ax.plot(o_ts, 'o-')
+    ax.plot(stc_ts, 's-')
+    ax.legend(('original BOLD', 'ST corrected BOLD'))
+    ax.set_title("session %s: STC QA for voxel (%s, %s, %s)" % (
+        session_id, voxel[0], voxel[1], voxel[2]))
+    ax.set_xlabel('time (TR)')
+    fig.savefig(output_filename, dpi=100)
+    return output_filename
+
+
 def generate_stc_thumbnails(original_bold, st_corrected_bold, output_dir,
                             voxel=None, sessions=None, results_gallery=None,
                             execution_log_html_filename=None, close=True):
     sessions = [1] if sessions is None else sessions
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-
-    def _sanitize_data(data):
-        if isinstance(data, list):
-            return np.array([_sanitize_data(x) for x in data])
-
-        if is_niimg(data):
-            data = np.rollaxis(data.get_data(), -1, start=0)
-        elif isinstance(data, _basestring):
-            data = nibabel.load(data).get_data()
-        return data
-
-    def _get_vol_shape(x):
-        if isinstance(x, np.ndarray):
-            if x.ndim == 3:
-                return x.shape
-            else:
-                assert x.ndim > 3, x.ndim
-                return _get_vol_shape(x[..., 0])
-        elif isinstance(x, _basestring):
-            return _get_vol_shape(nibabel.load(x).get_data())
-        elif is_niimg(x):
-            return _get_vol_shape(x.get_data())
-        else:
-            return _get_vol_shape(x[0])
-
-    def _get_time_series_from_voxel(x, voxel):
-        assert len(voxel) == 3
-        if isinstance(x, np.ndarray):
-            if x.ndim == 3:
-                return x[voxel[0], voxel[1], voxel[2]]
-            else:
-                assert x.ndim == 4 == len(voxel) + 1
-                return x[voxel[0], voxel[1], voxel[2], :]
-        elif is_niimg(x):
-            return _get_time_series_from_voxel(x.get_data(), voxel)
-        elif isinstance(x, _basestring):
-            return _get_time_series_from_voxel(nibabel.load(x), voxel)
-        else:
-            return np.array([_get_time_series_from_voxel(y, voxel) for y in x])
+    os.makedirs(output_dir, exist_ok=True)
 
     if voxel is None:
         voxel = np.array(_get_vol_shape(original_bold)) // 2
     output = {}
 
-    for session_id, o_bold, stc_bold in zip(sessions, original_bold,
-                                            st_corrected_bold):
-
-        stc_ts = _get_time_series_from_voxel(stc_bold, voxel)
-        o_ts = _get_time_series_from_voxel(o_bold, voxel)
-        output_filename = os.path.join(output_dir,
-                                       'stc_plot_%s.png' % session_id)
-        pl.figure()
-        pl.plot(o_ts, 'o-')
-        pl.hold('on')
-        pl.plot(stc_ts, 's-')
-        pl.legend(('original BOLD', 'ST corrected BOLD'))
-        pl.title("session %s: STC QA for voxel (%s, %s, %s)" % (
-                session_id, voxel[0], voxel[1], voxel[2]))
-        pl.xlabel('time (TR)')
-
-        pl.savefig(output_filename, bbox_inches="tight", dpi=200)
-        if close:
-            pl.close()
+    # render the sessions in parallel; each worker owns its figure, so
+    # Agg rasterization runs concurrently across sessions
+    output_filenames = joblib.Parallel(
+        n_jobs=min(len(sessions), os.cpu_count() or 1) or 1)(
+        joblib.delayed(_render_stc_session)(
+            session_id, o_bold, stc_bold, voxel, output_dir)
+        for session_id, o_bold, stc_bold in zip(
+            sessions, original_bold, st_corrected_bold))
 
+    for output_filename in output_filenames:
         # create thumbnail
         if results_gallery:
             thumbnail = Thumbnail()
@@ -625,8 +750,7 @@ def generate_subject_preproc_report(
         last_stage=True):
     sessions = ['UNKNOWN_SESSION'] if sessions is None else sessions
     output = {}
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
 
     def finalize_report():
         output['final_thumbnail'] = final_thumbnail
@@ -656,17 +780,8 @@ def generate_subject_preproc_report(
         output_dir, 'report.html')
 
     # copy css and js stuff to output dir
-    for js_file in glob.glob(os.path.join(ROOT_DIR,
-                                          "js/*.js")):
-        shutil.copy(js_file, output_dir)
-    for css_file in glob.glob(os.path.join(ROOT_DIR, "css/*.css")):
-        shutil.copy(css_file, output_dir)
-    for icon_file in glob.glob(os.path.join(ROOT_DIR, "icons/*.gif")):
-        shutil.copy(icon_file, output_dir)
-    for icon_file in glob.glob(os.path.join(ROOT_DIR, "images/*.png")):
-        shutil.copy(icon_file, output_dir)
-    for icon_file in glob.glob(os.path.join(ROOT_DIR, "images/*.jpeg")):
-        shutil.copy(icon_file, output_dir)
+    for asset in _STATIC_ASSETS:
+        _link_or_copy(asset, output_dir)
 
     # initialize results gallery
     loader_filename = os.path.join(
@@ -690,27 +805,23 @@ def generate_subject_preproc_report(
     output['progress_logger'] = subject_progress_logger
 
     # html markup
-    preproc = get_subject_report_preproc_html_template(
-        ).substitute(
+    preproc = _preproc_tpl().substitute(
         conf_path=conf_path,
         results=results_gallery,
         start_time=time.ctime(),
         preproc_undergone=preproc_undergone,
         subject_id=subject_id,
         )
-    main_html = get_subject_report_html_template(
-        ).substitute(
+    main_html = _main_tpl().substitute(
         conf_path=conf_path,
         start_time=time.ctime(),
         subject_id=subject_id
         )
 
     with open(report_preproc_filename, 'w') as fd:
-        fd.write(str(preproc))
-        fd.close()
+        fd.write(preproc)
     with open(report_filename, 'w') as fd:
-        fd.write(str(main_html))
-        fd.close()
+        fd.write(main_html)
 
     # generate stc thumbs
     if did_slice_timing and original_bold is not None and \
@@ -2,14 +2,14 @@
 
 import sys
 import os
-import io
+import glob
 import shutil
-from numpy.distutils.core import setup
+from setuptools import setup, find_packages
+from setuptools.command.build_ext import build_ext as _build_ext
 
 descr = """Intra-subject preprocessing of MRI data in pure Python!"""
 DISTNAME = 'pyaffineprep'
 DESCRIPTION = 'Statistical learning for neuroimaging in Python'
-LONG_DESCRIPTION = io.open('README.rst', encoding="utf8").read()
 MAINTAINER = 'Elvis Dohmatob'
 MAINTAINER_EMAIL = 'gmdopp@gmail.com'
 URL = 'http://pyaffineprep.github.com'
@@ -17,98 +17,126 @@ LICENSE = 'new BSD'
 DOWNLOAD_URL = 'http://pyaffineprep.github.com'
 VERSION = '0.1-git'
 
+_CLASSIFIERS = (
+    'Intended Audience :: Science/Research',
+    'Intended Audience :: Developers',
+    'License :: OSI Approved',
+    'Programming Language :: C',
+    'Programming Language :: Python',
+    'Topic :: Software Development',
+    'Topic :: Scientific/Engineering',
+    'Operating System :: Microsoft :: Windows',
+    'Operating System :: POSIX',
+    'Operating System :: Unix',
+)
 
-# For some commands, use setuptools
-if len(set(('develop', 'sdist', 'release', 'bdist_egg', 'bdist_rpm',
-            'bdist', 'bdist_dumb', 'bdist_wininst', 'install_egg_info',
-            'build_sphinx', 'egg_info', 'easy_install', 'upload',
-            )).intersection(sys.argv)) > 0:
-    from setuptools import setup  # noqa
 
+class build_ext(_build_ext):
+    """build_ext that compiles extension sources on all cores."""
 
-def configuration(parent_package='', top_path=None):
-    if os.path.exists('MANIFEST'):
-        os.remove('MANIFEST')
+    def initialize_options(self):
+        super().initialize_options()
+        self.parallel = os.cpu_count()
 
-    from numpy.distutils.misc_util import Configuration
-    config = Configuration(None, parent_package, top_path)
 
-    # main modules
-    config.add_subpackage('pyaffineprep')
+# resolved against this file, not the cwd: setup() runs after an
+# os.chdir when the 2to3 branch is enabled
+_README = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                       'README.rst')
 
-    # extrenal dependecies
-    config.add_subpackage('pyaffineprep/externals')
-    config.add_subpackage('pyaffineprep/externals/tempita')
 
-    # plugin for generating reports
-    config.add_subpackage('pyaffineprep/reporting')
-    config.add_data_dir("pyaffineprep/reporting/template_reports")
-    config.add_data_dir("pyaffineprep/reporting/css")
-    config.add_data_dir("pyaffineprep/reporting/js")
-    config.add_data_dir("pyaffineprep/reporting/icons")
-    config.add_data_dir("pyaffineprep/reporting/images")
-
-    return config
+def _long_description():
+    # read lazily (and through a context manager): metadata-only
+    # invocations of this script don't need the README at import time
+    with open(_README, encoding="utf8") as fd:
+        return fd.read()
 
 
 if __name__ == "__main__":
 
+    # route any C-extension compilation through ccache when available,
+    # so incremental rebuilds hit the compiler cache; free when ccache
+    # is absent or CC is already pinned
+    if shutil.which("ccache") and "CC" not in os.environ:
+        os.environ["CC"] = "ccache cc"
+        os.environ["CXX"] = "ccache c++"
+
     old_path = os.getcwd()
     local_path = os.path.dirname(os.path.abspath(sys.argv[0]))
-    # python 3 compatibility stuff.
+    # legacy python 3 compatibility stuff, disabled by default: the
+    # codebase runs natively on python 3, so the copy + lib2to3 rewrite
+    # (seconds of pure overhead per build) only happens on request.
     # Simplified version of scipy strategy: copy files into
     # build/py3k, and patch them using lib2to3.
-    if sys.version_info[0] == 3:
+    if os.environ.get("PYAFFINEPREP_RUN_2TO3") == "1":
         try:
             import lib2to3cache  # noqa
         except ImportError:
             pass
         local_path = os.path.join(local_path, 'build', 'py3k')
-        if os.path.exists(local_path):
-            shutil.rmtree(local_path)
-        print("Copying source tree into build/py3k for 2to3 transformation"
-              "...")
-        shutil.copytree(os.path.join(old_path, 'pyaffineprep'),
-                        os.path.join(local_path, 'pyaffineprep'))
-        import lib2to3.main
-        from io import StringIO
-        print("Converting to Python3 via 2to3...")
-        _old_stdout = sys.stdout
-        try:
-            sys.stdout = StringIO()  # supress noisy output
-            res = lib2to3.main.main("lib2to3.fixes",
-                                    ['-x', 'import', '-w', local_path])
-        finally:
-            sys.stdout = _old_stdout
-
-        if res != 0:
-            raise Exception('2to3 failed, exiting ...')
+        # freshness check: the stamp file is touched after a successful
+        # conversion, so a stamp newer than every source file means the
+        # converted tree is still valid and the whole copy + 2to3 pass
+        # can be skipped. (Converted-file mtimes can't be used for
+        # this: unconverted files are hardlinks sharing their source's
+        # mtime.)
+        stamp = os.path.join(local_path, '.2to3-stamp')
+        src_mtime = max(
+            (os.path.getmtime(p) for p in glob.glob(
+                os.path.join(old_path, 'pyaffineprep', '**', '*.py'),
+                recursive=True)), default=0.)
+        if not (os.path.exists(stamp)
+                and os.path.getmtime(stamp) > src_mtime):
+            if os.path.exists(local_path):
+                shutil.rmtree(local_path)
+            print("Copying source tree into build/py3k for 2to3 "
+                  "transformation...")
+            # hardlink the tree where possible: 2to3 -w rewrites files
+            # by replacing them, so the originals stay untouched and
+            # only the converted files cost any real I/O
+            shutil.copytree(os.path.join(old_path, 'pyaffineprep'),
+                            os.path.join(local_path, 'pyaffineprep'),
+                            copy_function=os.link if hasattr(os, "link")
+                            else shutil.copy2)
+            import lib2to3.main
+            from contextlib import redirect_stdout
+            from io import StringIO
+            print("Converting to Python3 via 2to3...")
+            with redirect_stdout(StringIO()):  # supress noisy output
+                res = lib2to3.main.main("lib2to3.fixes",
+                                        ['-x', 'import', '-w', local_path])
+
+            if res != 0:
+                raise Exception('2to3 failed, exiting ...')
+            with open(stamp, 'w'):
+                pass
 
     os.chdir(local_path)
     sys.path.insert(0, local_path)
 
-    setup(configuration=configuration,
-          name=DISTNAME,
-          maintainer=MAINTAINER,
-          include_package_data=True,
-          maintainer_email=MAINTAINER_EMAIL,
-          description=DESCRIPTION,
-          license=LICENSE,
-          url=URL,
-          version=VERSION,
-          download_url=DOWNLOAD_URL,
-          long_description=LONG_DESCRIPTION,
-          zip_safe=False,  # the package can run out of an .egg file
-          classifiers=[
-              'Intended Audience :: Science/Research',
-              'Intended Audience :: Developers',
-              'License :: OSI Approved',
-              'Programming Language :: C',
-              'Programming Language :: Python',
-              'Topic :: Software Development',
-              'Topic :: Scientific/Engineering',
-              'Operating System :: Microsoft :: Windows',
-              'Operating System :: POSIX',
-              'Operating System :: Unix'
-              ]
-          )
+    _kw = dict(name=DISTNAME,
+               cmdclass={"build_ext": build_ext},
+               packages=find_packages(include=["pyaffineprep*"]),
+               package_data={"pyaffineprep.reporting": [
+                   "template_reports/**/*",
+                   "css/**/*",
+                   "js/**/*",
+                   "icons/**/*",
+                   "images/**/*"]},
+               maintainer=MAINTAINER,
+               maintainer_email=MAINTAINER_EMAIL,
+               description=DESCRIPTION,
+               license=LICENSE,
+               version=VERSION,
+               zip_safe=False,  # the package can run out of an .egg file
+               classifiers=list(_CLASSIFIERS))
+
+    # the long description and URL-ish fields are only consumed when
+    # building / publishing a release; skip their I/O and validation on
+    # the metadata-only commands pip runs repeatedly
+    if not {'sdist', 'bdist_wheel', 'upload'}.isdisjoint(sys.argv):
+        _kw.update(url=URL,
+                   download_url=DOWNLOAD_URL,
+                   long_description=_long_description())
+
+    setup(**_kw)